@@ -5,128 +5,231 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
+import asyncio
+import hashlib
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import orjson
+
+from sqlalchemy import bindparam, delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import (Activity, Participant, SessionLocal, engine, get_db,
+                      init_db)
+
+# The handful of statements the app runs are fixed, so their expression
+# trees are built once at import time; per-request values arrive through
+# bound parameters
+_SELECT_ACTIVITY_INFO = select(Activity.name, Activity.id,
+                               Activity.max_participants)
+_SELECT_ACTIVITIES = select(Activity.id, Activity.name, Activity.description,
+                            Activity.schedule, Activity.max_participants)
+_SELECT_PARTICIPANTS = select(Participant.activity_id, Participant.email)
+_SIGNUP_INSERT = insert(Participant.__table__).from_select(
+    [Participant.__table__.c.activity_id, Participant.__table__.c.email],
+    select(bindparam("activity_id"), bindparam("email")).where(
+        select(func.count()).select_from(Participant).where(
+            Participant.activity_id == bindparam("activity_id")
+        ).scalar_subquery() < bindparam("max_participants")))
+_UNREGISTER_DELETE = delete(Participant.__table__).where(
+    Participant.activity_id == bindparam("activity_id"),
+    Participant.email == bindparam("email"))
+
+# Activity names and capacities are fixed at seed time, so the mutating
+# endpoints resolve them from this map instead of querying per request
+_activity_info: dict[str, tuple[int, int]] = {}
+
+
+async def _load_activity_info():
+    async with SessionLocal() as db:
+        for name, activity_id, max_participants in await db.execute(
+                _SELECT_ACTIVITY_INFO):
+            _activity_info[name] = (activity_id, max_participants)
+
+
+# SQLite allows one writer at a time, so all writes are funneled through
+# a single worker task instead of contending for the file lock
+_write_queue: asyncio.Queue | None = None
+_writer_task: asyncio.Task | None = None
+
+
+async def _write_worker():
+    while True:
+        fn, future = await _write_queue.get()
+        try:
+            result = await fn()
+        except Exception as exc:
+            if not future.cancelled():
+                future.set_exception(exc)
+        else:
+            if not future.cancelled():
+                future.set_result(result)
+        finally:
+            _write_queue.task_done()
+
+
+async def _run_write(fn):
+    """Queue a write for the single writer task and await its result"""
+    future = asyncio.get_running_loop().create_future()
+    await _write_queue.put((fn, future))
+    return await future
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the database tables, seed the default activities, and run
+    the single-writer task for the lifetime of the app"""
+    global _write_queue, _writer_task
+    await init_db()
+    await _load_activity_info()
+    _write_queue = asyncio.Queue()
+    _writer_task = asyncio.create_task(_write_worker())
+    yield
+    _writer_task.cancel()
+
+
 app = FastAPI(title="Mergington High School API",
-              description="API for viewing and signing up for extracurricular activities")
+              description="API for viewing and signing up for extracurricular activities",
+              default_response_class=ORJSONResponse,
+              lifespan=lifespan)
 
 # Mount the static files directory
 current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
-activities = {
-    "Chess Club": {
-        "description": "Learn strategies and compete in chess tournaments",
-        "schedule": "Fridays, 3:30 PM - 5:00 PM",
-        "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-    },
-    "Programming Class": {
-        "description": "Learn programming fundamentals and build software projects",
-        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-        "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-    },
-    "Gym Class": {
-        "description": "Physical education and sports activities",
-        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-        "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-    },
-    "Soccer Team": {
-        "description": "Join the school soccer team and compete in matches",
-        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
-        "max_participants": 22,
-        "participants": ["liam@mergington.edu", "noah@mergington.edu"]
-    },
-    "Basketball Team": {
-        "description": "Practice and play basketball with the school team",
-        "schedule": "Wednesdays and Fridays, 3:30 PM - 5:00 PM",
-        "max_participants": 15,
-        "participants": ["ava@mergington.edu", "mia@mergington.edu"]
-    },
-    "Art Club": {
-        "description": "Explore your creativity through painting and drawing",
-        "schedule": "Thursdays, 3:30 PM - 5:00 PM",
-        "max_participants": 15,
-        "participants": ["amelia@mergington.edu", "harper@mergington.edu"]
-    },
-    "Drama Club": {
-        "description": "Act, direct, and produce plays and performances",
-        "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
-        "max_participants": 20,
-        "participants": ["ella@mergington.edu", "scarlett@mergington.edu"]
-    },
-    "Math Club": {
-        "description": "Solve challenging problems and participate in math competitions",
-        "schedule": "Tuesdays, 3:30 PM - 4:30 PM",
-        "max_participants": 10,
-        "participants": ["james@mergington.edu", "benjamin@mergington.edu"]
-    },
-    "Debate Team": {
-        "description": "Develop public speaking and argumentation skills",
-        "schedule": "Fridays, 4:00 PM - 5:30 PM",
-        "max_participants": 12,
-        "participants": ["charlotte@mergington.edu", "henry@mergington.edu"]
-    }
-}
-
 
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
+# Activities change only through signup/unregister, so the serialized
+# /activities response is cached here as (body bytes, ETag) and
+# invalidated on each write
+_activities_cache: tuple[bytes, str] | None = None
+_cache_lock = asyncio.Lock()
+
+
+def _invalidate_activities_cache():
+    global _activities_cache
+    _activities_cache = None
+
+
+@app.get("/pool-health")
+def pool_health():
+    """Report connection pool usage for monitoring"""
+    return {"status": engine.sync_engine.pool.status()}
+
+
 @app.get("/activities")
-def get_activities():
-    return activities
+async def get_activities(request: Request,
+                         db: AsyncSession = Depends(get_db)):
+    global _activities_cache
+    cached = _activities_cache
+    if cached is None:
+        async with _cache_lock:
+            if _activities_cache is None:
+                # Plain Core selects: no ORM instrumentation or identity map
+                # overhead on this read-only path
+                participants = {}
+                for activity_id, email in await db.execute(
+                        _SELECT_PARTICIPANTS):
+                    participants.setdefault(activity_id, []).append(email)
+                payload = {
+                    row.name: {
+                        "description": row.description,
+                        "schedule": row.schedule,
+                        "max_participants": row.max_participants,
+                        "participants": participants.get(row.id, []),
+                    }
+                    for row in await db.execute(_SELECT_ACTIVITIES)
+                }
+                body = orjson.dumps(payload)
+                etag = '"%s"' % hashlib.blake2b(
+                    body, digest_size=8).hexdigest()
+                _activities_cache = (body, etag)
+            cached = _activities_cache
+    body, etag = cached
+    # Short client-side caching plus revalidation: browsers and proxies
+    # can answer most polls themselves, revalidating against the ETag
+    headers = {"ETag": etag,
+               "Cache-Control": "public, max-age=5, must-revalidate"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json",
+                    headers=headers)
 
 
 @app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+async def signup_for_activity(activity_name: str, email: str):
     """Sign up a student for an activity"""
     # Validate activity exists
-    if activity_name not in activities:
+    info = _activity_info.get(activity_name)
+    if info is None:
         raise HTTPException(status_code=404, detail="Activity not found")
-
-    # Get the specific activity
-    activity = activities[activity_name]
-
-    # Validate student is not already signed up
-    if email in activity["participants"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Student is already signed up"
-        )
-
-    # Add student
-    activity["participants"].append(email)
-    return {"message": f"Signed up {email} for {activity_name}"}
+    activity_id, max_participants = info
+
+    async def do_signup():
+        async with SessionLocal() as db:
+            # Add student in one conditional INSERT: the SELECT only
+            # yields a row while the activity has capacity, so two
+            # concurrent signups cannot both slip past the limit, and
+            # the unique constraint rejects duplicate signups
+            conn = await db.connection()
+            try:
+                result = await conn.execute(_SIGNUP_INSERT, {
+                    "activity_id": activity_id,
+                    "email": email,
+                    "max_participants": max_participants,
+                })
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail="Student is already signed up"
+                )
+            if result.rowcount == 0:
+                raise HTTPException(
+                    status_code=400, detail="Activity is full")
+            _invalidate_activities_cache()
+            return {"message": f"Signed up {email} for {activity_name}"}
+
+    return await _run_write(do_signup)
 
 
 @app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
+async def unregister_from_activity(activity_name: str, email: str):
     """Unregister a student from an activity"""
     # Validate activity exists
-    if activity_name not in activities:
+    info = _activity_info.get(activity_name)
+    if info is None:
         raise HTTPException(status_code=404, detail="Activity not found")
-
-    # Get the specific activity
-    activity = activities[activity_name]
-
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Student is not signed up for this activity"
-        )
-
-    # Remove student
-    activity["participants"].remove(email)
-    return {"message": f"Unregistered {email} from {activity_name}"}
+    activity_id, _ = info
+
+    async def do_unregister():
+        async with SessionLocal() as db:
+            # Remove student; rowcount tells us whether they were
+            # signed up
+            conn = await db.connection()
+            result = await conn.execute(_UNREGISTER_DELETE, {
+                "activity_id": activity_id,
+                "email": email,
+            })
+            await db.commit()
+            if result.rowcount == 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Student is not signed up for this activity"
+                )
+            _invalidate_activities_cache()
+            return {"message": f"Unregistered {email} from {activity_name}"}
+
+    return await _run_write(do_unregister)
@@ -0,0 +1,195 @@
+"""
+Database setup for the High School Management System API
+
+Defines the SQLAlchemy engine, session factory, and the Activity model
+backing the extracurricular activities, plus the initial seed data.
+"""
+
+from pathlib import Path
+
+from sqlalchemy import (Column, ForeignKey, Integer, String, UniqueConstraint,
+                        event, insert, literal, select)
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+DATABASE_URL = "sqlite+aiosqlite:///./activities.db"
+
+# Keep a pool of warm connections instead of reopening the database file
+# on every request; overflow and timeout absorb bursts beyond pool_size
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune SQLite for concurrent readers alongside a single writer.
+
+    WAL mode lets reads proceed while a write is in flight, and the busy
+    timeout absorbs brief lock contention instead of failing immediately
+    with "database is locked". Skipped for in-memory databases, where WAL
+    is not supported.
+    """
+    # Disable pysqlite's implicit transaction handling; transactions are
+    # opened explicitly by the begin hook below
+    dbapi_connection.isolation_level = None
+    if ":memory:" in DATABASE_URL:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _begin_immediate(conn):
+    """Open transactions with BEGIN IMMEDIATE.
+
+    Taking the write lock up front avoids the SQLITE_BUSY that hits a
+    transaction trying to upgrade from reader to writer mid-flight,
+    which the busy timeout cannot wait out.
+    """
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+SessionLocal = async_sessionmaker(engine, autoflush=False,
+                                  expire_on_commit=False)
+
+Base = declarative_base()
+
+
+class Activity(Base):
+    """An extracurricular activity students can sign up for"""
+
+    __tablename__ = "activities"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True)
+    description = Column(String)
+    schedule = Column(String)
+    max_participants = Column(Integer)
+
+
+class Participant(Base):
+    """A student's registration for one activity"""
+
+    __tablename__ = "participants"
+    __table_args__ = (UniqueConstraint("activity_id", "email"),)
+
+    id = Column(Integer, primary_key=True)
+    activity_id = Column(Integer, ForeignKey("activities.id"), index=True)
+    email = Column(String, index=True)
+
+
+# Initial set of activities used to seed an empty database
+default_activities = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+    },
+    "Soccer Team": {
+        "description": "Join the school soccer team and compete in matches",
+        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
+        "max_participants": 22,
+        "participants": ["liam@mergington.edu", "noah@mergington.edu"]
+    },
+    "Basketball Team": {
+        "description": "Practice and play basketball with the school team",
+        "schedule": "Wednesdays and Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 15,
+        "participants": ["ava@mergington.edu", "mia@mergington.edu"]
+    },
+    "Art Club": {
+        "description": "Explore your creativity through painting and drawing",
+        "schedule": "Thursdays, 3:30 PM - 5:00 PM",
+        "max_participants": 15,
+        "participants": ["amelia@mergington.edu", "harper@mergington.edu"]
+    },
+    "Drama Club": {
+        "description": "Act, direct, and produce plays and performances",
+        "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
+        "max_participants": 20,
+        "participants": ["ella@mergington.edu", "scarlett@mergington.edu"]
+    },
+    "Math Club": {
+        "description": "Solve challenging problems and participate in math competitions",
+        "schedule": "Tuesdays, 3:30 PM - 4:30 PM",
+        "max_participants": 10,
+        "participants": ["james@mergington.edu", "benjamin@mergington.edu"]
+    },
+    "Debate Team": {
+        "description": "Develop public speaking and argumentation skills",
+        "schedule": "Fridays, 4:00 PM - 5:30 PM",
+        "max_participants": 12,
+        "participants": ["charlotte@mergington.edu", "henry@mergington.edu"]
+    }
+}
+
+
+# Sentinel file written once seeding has completed, so additional workers
+# skip the seed check without opening a session
+SEED_MARKER = Path("./.seeded")
+
+
+async def init_db():
+    """Create tables and seed the default activities if the DB is empty"""
+    if SEED_MARKER.exists():
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as db:
+        # Existence check rather than COUNT(*): stops at the first row
+        already_seeded = (await db.execute(
+            select(literal(1)).select_from(Activity).limit(1)
+        )).first() is not None
+        if already_seeded:
+            SEED_MARKER.touch()
+            return
+        # Core bulk inserts: one statement per table, no per-row ORM
+        # unit-of-work bookkeeping
+        await db.execute(insert(Activity), [
+            {
+                "name": name,
+                "description": details["description"],
+                "schedule": details["schedule"],
+                "max_participants": details["max_participants"],
+            }
+            for name, details in default_activities.items()
+        ])
+        activity_ids = dict(
+            (await db.execute(select(Activity.name, Activity.id))).all())
+        await db.execute(insert(Participant), [
+            {"activity_id": activity_ids[name], "email": email}
+            for name, details in default_activities.items()
+            for email in details["participants"]
+        ])
+        await db.commit()
+        SEED_MARKER.touch()
+
+
+async def get_db():
+    """Yield a database session for a single request"""
+    async with SessionLocal() as db:
+        yield db